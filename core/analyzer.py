@@ -9,14 +9,27 @@ class SmartAnalyzer:
     def __init__(self, config: Dict):
         self.config = config
         self.historical_data = {}
+        self.last_snapshot = {}
+        self.stored_snapshot = {}
+        self.check_interval = config.get('monitor', {}).get('check_interval', 1)
+        self.last_analysis = {}
+        self.changed_symbols = set()
         self.logger = logging.getLogger(__name__)
     
     async def analyze_market(self, market_data: Dict) -> Dict:
         """تحلیل کامل بازار"""
         analysis = {}
+        self.changed_symbols = set()
         
         for symbol, data in market_data.items():
             try:
+                # استفاده از نتیجه قبلی برای ارزهای بدون تغییر
+                snapshot = self.take_snapshot(data)
+                if self.last_snapshot.get(symbol) == snapshot:
+                    self.touch_historical_data(symbol)
+                    analysis[symbol] = self.last_analysis[symbol]
+                    continue
+                
                 # ذخیره داده‌های تاریخی
                 self.store_historical_data(symbol, data)
                 
@@ -32,19 +45,45 @@ class SmartAnalyzer:
                     'support_resistance': self.find_support_resistance(symbol),
                     'timestamp': datetime.now()
                 }
+                # ثبت داده فقط پس از تحلیل موفق تا نتیجه کهنه به‌عنوان کش استفاده نشود
+                self.last_analysis[symbol] = analysis[symbol]
+                self.last_snapshot[symbol] = snapshot
+                self.changed_symbols.add(symbol)
                 
             except Exception as e:
                 self.logger.error(f"خطا در تحلیل {symbol}: {e}")
         
         return analysis
     
+    @staticmethod
+    def take_snapshot(data: Dict) -> tuple:
+        """مقادیری که تغییر ارز بر اساس آن‌ها تشخیص داده می‌شود"""
+        return (data['price'], data['volume'], data['price_change_percent'])
+    
+    def touch_historical_data(self, symbol: str):
+        """ثبت زمان آخرین مشاهده برای داده بدون تغییر"""
+        if self.historical_data.get(symbol):
+            self.historical_data[symbol][-1]['last_seen'] = datetime.now()
+    
     def store_historical_data(self, symbol: str, data: Dict):
         """ذخیره داده‌های تاریخی"""
         if symbol not in self.historical_data:
             self.historical_data[symbol] = []
         
-        self.historical_data[symbol].append({
-            'timestamp': datetime.now(),
+        # هر رکورد یک مشاهده متمایز است که از timestamp تا رکورد بعدی (یا last_seen) برقرار بوده
+        now = datetime.now()
+        history = self.historical_data[symbol]
+        snapshot = self.take_snapshot(data)
+        
+        # تکرار همان داده (مثلاً پس از تحلیل ناموفق) رکورد جدیدی نمی‌سازد
+        if history and self.stored_snapshot.get(symbol) == snapshot:
+            history[-1]['last_seen'] = now
+            return
+        
+        self.stored_snapshot[symbol] = snapshot
+        history.append({
+            'timestamp': now,
+            'last_seen': now,
             'price': data['price'],
             'volume': data['volume'],
             'price_change': data['price_change_percent']
@@ -59,34 +98,73 @@ class SmartAnalyzer:
         if symbol not in self.historical_data or len(self.historical_data[symbol]) < 2:
             return 0.0
         
-        # محاسبه میانگین حجم در 24 ساعت گذشته
-        recent_data = self.historical_data[symbol][-1440:]  # 24 ساعت * 60 دقیقه
-        if not recent_data:
-            return 0.0
-        
-        avg_volume = statistics.mean([d['volume'] for d in recent_data])
+        avg_volume = self.time_weighted_volume(symbol, timedelta(hours=24))
         if avg_volume == 0:
             return 0.0
         
         return ((current_volume - avg_volume) / avg_volume) * 100
     
+    def time_weighted_volume(self, symbol: str, period: timedelta) -> float:
+        """میانگین حجم در بازه زمانی، وزن‌دار بر اساس مدت اعتبار هر رکورد"""
+        records = self.historical_data[symbol]
+        cutoff = datetime.now() - period
+        total_volume = 0.0
+        total_seconds = 0.0
+        
+        # هر رکورد تا رکورد بعدی (یا آخرین مشاهده) معتبر است
+        end = records[-1]['last_seen']
+        for record in reversed(records):
+            if end <= cutoff:
+                break
+            
+            seconds = (end - max(record['timestamp'], cutoff)).total_seconds()
+            total_volume += record['volume'] * seconds
+            total_seconds += seconds
+            end = record['timestamp']
+        
+        if total_seconds <= 0:
+            return statistics.mean([d['volume'] for d in records])
+        
+        return total_volume / total_seconds
+    
+    def sampled_prices(self, symbol: str, count: int) -> List[float]:
+        """قیمت در count تیک اخیر با فاصله check_interval، بازسازی‌شده از رکوردهای تغییر"""
+        records = self.historical_data.get(symbol)
+        if not records:
+            return []
+        
+        step = timedelta(seconds=self.check_interval)
+        sample_time = records[-1]['last_seen']
+        prices = []
+        i = len(records) - 1
+        while len(prices) < count:
+            # رکوردی که در زمان نمونه برقرار بوده
+            while i >= 0 and records[i]['timestamp'] > sample_time:
+                i -= 1
+            if i < 0:
+                break
+            prices.append(records[i]['price'])
+            sample_time -= step
+        
+        prices.reverse()
+        return prices
+    
     def calculate_volatility(self, symbol: str, period: int = 20) -> float:
         """محاسبه نوسانات"""
-        if symbol not in self.historical_data or len(self.historical_data[symbol]) < period:
+        prices = self.sampled_prices(symbol, period)
+        if len(prices) < period:
             return 0.0
         
-        prices = [d['price'] for d in self.historical_data[symbol][-period:]]
         returns = [(prices[i] - prices[i-1]) / prices[i-1] for i in range(1, len(prices))]
         
         return statistics.stdev(returns) * 100 if returns else 0.0
     
     def detect_trend(self, symbol: str, period: int = 20) -> str:
         """تشخیص روند"""
-        if symbol not in self.historical_data or len(self.historical_data[symbol]) < period:
+        prices = self.sampled_prices(symbol, period)
+        if len(prices) < period:
             return "نامشخص"
         
-        prices = [d['price'] for d in self.historical_data[symbol][-period:]]
-        
         # محاسبه خط روند ساده
         x = list(range(len(prices)))
         slope = self.calculate_slope(x, prices)
@@ -111,10 +189,10 @@ class SmartAnalyzer:
     
     def calculate_momentum(self, symbol: str, period: int = 10) -> float:
         """محاسبه مومنتوم"""
-        if symbol not in self.historical_data or len(self.historical_data[symbol]) < period + 1:
+        prices = self.sampled_prices(symbol, period + 1)
+        if len(prices) < period + 1:
             return 0.0
         
-        prices = [d['price'] for d in self.historical_data[symbol]]
         current_price = prices[-1]
         past_price = prices[-(period + 1)]
         
@@ -122,11 +200,10 @@ class SmartAnalyzer:
     
     def find_support_resistance(self, symbol: str) -> Dict:
         """یافتن سطوح حمایت و مقاومت"""
-        if symbol not in self.historical_data or len(self.historical_data[symbol]) < 50:
+        prices = self.sampled_prices(symbol, 50)
+        if len(prices) < 50:
             return {'support': 0, 'resistance': 0}
         
-        prices = [d['price'] for d in self.historical_data[symbol][-100:]]
-        
         # یافتن سطوح با استفاده از پیوت پوینت‌ها
         pivot_high = max(prices[-20:])
         pivot_low = min(prices[-20:])
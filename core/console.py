@@ -0,0 +1,72 @@
+﻿import sys
+import time
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Dict
+
+class ConsoleLogHandler(logging.Handler):
+    """نگهداری آخرین هشدارها و خطاها برای نمایش زیر جدول کنسول"""
+
+    def __init__(self, capacity: int = 5):
+        super().__init__(level=logging.WARNING)
+        self.records = deque(maxlen=capacity)
+        self.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s', '%H:%M:%S'))
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            self.records.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+class ConsoleView:
+    """نمایش جدول وضعیت در کنسول با نرخ به‌روزرسانی محدود"""
+
+    CLEAR_SCREEN = "\x1b[H\x1b[2J"
+
+    def __init__(self, config: Dict, stream=None):
+        self.config = config
+        self.stream = stream or sys.stdout
+        monitor_config = config.get('monitor', {})
+        self.refresh_interval = monitor_config.get('console_refresh', 1.0)
+        self.rows = {}
+        self.last_render = 0.0
+        # در خروجی هدایت‌شده به فایل، کدهای پاک‌کردن صفحه نوشته نمی‌شوند
+        self.interactive = self.stream.isatty()
+
+        # در ترمینال لاگ کنسول پاک می‌شود، پس هشدارها زیر جدول نمایش داده می‌شوند
+        self.log_handler = None
+        if self.interactive:
+            self.log_handler = ConsoleLogHandler(monitor_config.get('console_log_lines', 5))
+            logging.getLogger().addHandler(self.log_handler)
+
+    def update(self, analysis: Dict):
+        """ثبت آخرین وضعیت ارزها و رسم جدول در صورت رسیدن زمان"""
+        self.rows.update(analysis)
+
+        now = time.monotonic()
+        if now - self.last_render >= self.refresh_interval:
+            self.last_render = now
+            self.render()
+
+    def render(self):
+        """رسم کامل جدول با یک بار نوشتن"""
+        lines = [
+            f"🐋 WhalePulse Pro - {datetime.now().strftime('%H:%M:%S')}",
+            f"{'نماد':<10} {'قیمت':>14} {'حجم':>18} {'تغییر':>9}",
+            "-" * 54
+        ]
+        for symbol, data in self.rows.items():
+            lines.append(f"{symbol:<10} {data['price']:>14.4f} "
+                         f"{data['volume']:>18,.0f} {data['price_change']:>+8.2f}%")
+
+        if self.log_handler and self.log_handler.records:
+            lines.append("-" * 54)
+            lines.extend(self.log_handler.records)
+
+        output = "\n".join(lines) + "\n"
+        if self.interactive:
+            output = self.CLEAR_SCREEN + output
+
+        self.stream.write(output)
+        self.stream.flush()
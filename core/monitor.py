@@ -1,20 +1,34 @@
 ﻿import asyncio
+import contextlib
 import time
 import logging
 from datetime import datetime
 from typing import Dict, List, Any
 
+from core.console import ConsoleView
+
 class WhaleMonitor:
     """کلاس اصلی نظارت بر بازار"""
     
-    def __init__(self, config: Dict, analyzer, notifier, plugins: List):
+    def __init__(self, config: Dict, analyzer, notifier, plugins: List,
+                 trade_detector=None, trade_stream=None):
         self.config = config
         self.analyzer = analyzer
         self.notifier = notifier
         self.plugins = plugins
+        self.trade_detector = trade_detector
+        self.trade_stream = trade_stream
         self.running = True
         self.last_status_report = time.time()
         self.alert_cooldown = {}
+        self.pending_sends = set()
+        self.trade_alert_cooldown = {}
+        
+        whale_config = config['strategies']['whale_alert']
+        self.trade_cooldown = whale_config.get('cooldown', 60)
+        self.max_pending_sends = whale_config.get('max_pending_sends', 10)
+        self.cooldown_override_ratio = whale_config.get('cooldown_override_ratio', 2)
+        self.console = ConsoleView(config)
         
     async def run(self):
         """اجرای اصلی مانیتور"""
@@ -30,29 +44,74 @@ class WhaleMonitor:
         
         await self.notifier.send_message(start_message)
         
-        while self.running:
-            try:
-                await self.check_market()
-                
-                # انتظار 1 ثانیه
-                for _ in range(10):
-                    if not self.running:
-                        break
-                    await asyncio.sleep(0.1)
+        # اجرای استریم معاملات در پس‌زمینه
+        stream_task = None
+        if self.trade_stream and self.trade_detector:
+            stream_task = asyncio.create_task(self.trade_stream.run(self.handle_trades))
+        
+        try:
+            while self.running:
+                try:
+                    await self.check_market()
                     
-            except KeyboardInterrupt:
-                logger.info("🛑 برنامه متوقف شد")
-                self.running = False
-                
-                # ارسال پیام توقف
-                stop_message = f"🛑 <b>WhalePulse Pro متوقف شد</b>\n" \
-                               f"⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-                await self.notifier.send_message(stop_message)
-                break
-                
-            except Exception as e:
-                logger.error(f"❌ خطا: {e}")
-                await asyncio.sleep(1)
+                    # انتظار 1 ثانیه
+                    for _ in range(10):
+                        if not self.running:
+                            break
+                        await asyncio.sleep(0.1)
+                        
+                except KeyboardInterrupt:
+                    logger.info("🛑 برنامه متوقف شد")
+                    self.running = False
+                    
+                    # ارسال پیام توقف
+                    stop_message = f"🛑 <b>WhalePulse Pro متوقف شد</b>\n" \
+                                   f"⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+                    await self.notifier.send_message(stop_message)
+                    break
+                    
+                except Exception as e:
+                    logger.error(f"❌ خطا: {e}")
+                    await asyncio.sleep(1)
+        
+        finally:
+            if stream_task:
+                self.trade_stream.stop()
+                stream_task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await stream_task
+            
+            # ارسال هشدارهای در حال ارسال پیش از خروج
+            if self.pending_sends:
+                await asyncio.gather(*self.pending_sends, return_exceptions=True)
+    
+    async def handle_trades(self, batch: List[str]):
+        """پردازش دسته پیام‌های استریم معاملات"""
+        # در هر دسته فقط بزرگ‌ترین هشدار هر ارز و جهت نگه داشته می‌شود
+        strongest = {}
+        for alert in self.trade_detector.process_batch(batch):
+            key = (alert['symbol'], alert['side'])
+            if key not in strongest or alert['notional'] > strongest[key]['notional']:
+                strongest[key] = alert
+        
+        current_time = time.time()
+        for key, alert in strongest.items():
+            # هشدار بسیار بزرگ‌تر از هشدار قبلی از زمان انتظار عبور می‌کند
+            last_time, last_notional = self.trade_alert_cooldown.get(key, (0, 0))
+            if current_time - last_time < self.trade_cooldown and \
+                    alert['notional'] < last_notional * self.cooldown_override_ratio:
+                continue
+            
+            if len(self.pending_sends) >= self.max_pending_sends:
+                logging.getLogger(__name__).warning(f"⚠️ صف ارسال پر است، هشدار {alert['symbol']} رد شد")
+                continue
+            
+            self.trade_alert_cooldown[key] = (current_time, alert['notional'])
+            
+            # ارسال در پس‌زمینه تا پردازش استریم متوقف نشود
+            task = asyncio.create_task(self.notifier.send_message(alert['message']))
+            self.pending_sends.add(task)
+            task.add_done_callback(self.pending_sends.discard)
     
     async def check_market(self):
         """بررسی وضعیت بازار"""
@@ -68,9 +127,10 @@ class WhaleMonitor:
         # تحلیل داده‌ها
         analysis = await self.analyzer.analyze_market(market_data)
         
-        # بررسی هشدارها
+        # بررسی هشدارها فقط برای ارزهای تغییر یافته
+        changed = {symbol: analysis[symbol] for symbol in self.analyzer.changed_symbols}
         alerts = []
-        for symbol, data in analysis.items():
+        for symbol, data in changed.items():
             if data['volume_change'] > self.config['strategies']['volume_spike']['threshold']:
                 alerts.append(self.create_alert(symbol, data))
         
@@ -88,7 +148,7 @@ class WhaleMonitor:
                 await self.notifier.send_message(alert['message'])
         
         # نمایش وضعیت در کنسول
-        self.console_display(analysis)
+        self.console_display(changed)
     
     def create_alert(self, symbol: str, data: Dict) -> Dict:
         """ایجاد پیام هشدار"""
@@ -111,6 +171,11 @@ class WhaleMonitor:
         for symbol, data in analysis.items():
             report += f"{data.get('emoji', '📈')} <b>{symbol}</b>: " \
                      f" ({data['price_change']:+.2f}%)\n"
+            
+            if self.trade_detector:
+                flow = self.trade_detector.get_aggregates(symbol)
+                report += f"   🐋 خرید/فروش {self.trade_detector.window:g}s: " \
+                         f"{flow['buy_notional']:,.0f} / {flow['sell_notional']:,.0f}\n"
         
         if alerts:
             report += f"\n🚨 <b>تعداد هشدارها: {len(alerts)}</b>"
@@ -119,8 +184,4 @@ class WhaleMonitor:
     
     def console_display(self, analysis: Dict):
         """نمایش وضعیت در کنسول"""
-        timestamp = datetime.now().strftime('%H:%M:%S')
-        for symbol, data in analysis.items():
-            print(f"[{timestamp}] {symbol}:  | "
-                  f"حجم: {data['volume']:,.0f} | "
-                  f"تغییر: {data['price_change']:+.2f}%")
+        self.console.update(analysis)
@@ -0,0 +1,173 @@
+﻿import json
+import logging
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+class TradeWindow:
+    """پنجره لغزان مجموع ارزش معاملات خرید و فروش"""
+
+    __slots__ = ('span', 'trades', 'buy_notional', 'sell_notional')
+
+    def __init__(self, span: float):
+        self.span = span
+        self.trades = deque()
+        self.buy_notional = 0.0
+        self.sell_notional = 0.0
+
+    def add(self, timestamp: float, notional: float, is_buy: bool):
+        """افزودن معامله و حذف معاملات خارج از پنجره"""
+        self.trades.append((timestamp, notional, is_buy))
+        if is_buy:
+            self.buy_notional += notional
+        else:
+            self.sell_notional += notional
+        self.expire(timestamp)
+
+    def expire(self, now: float):
+        """حذف معاملات قدیمی (هر معامله فقط یک بار حذف می‌شود)"""
+        cutoff = now - self.span
+        trades = self.trades
+        while trades and trades[0][0] <= cutoff:
+            _, notional, is_buy = trades.popleft()
+            if is_buy:
+                self.buy_notional -= notional
+            else:
+                self.sell_notional -= notional
+
+        # جلوگیری از انباشت خطای ممیز شناور
+        if not trades:
+            self.buy_notional = 0.0
+            self.sell_notional = 0.0
+
+    def side_notional(self, is_buy: bool) -> float:
+        return self.buy_notional if is_buy else self.sell_notional
+
+class WhaleTradeDetector:
+    """تشخیص معاملات بزرگ از استریم aggTrade بایننس"""
+
+    def __init__(self, config: Dict):
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+
+        whale_config = config['strategies']['whale_alert']
+        self.min_volume = float(whale_config['min_volume'])
+        self.window = float(whale_config.get('window', 60))
+        self.burst_window = float(whale_config.get('burst_window', 2))
+
+        self.windows = {}
+        self.bursts = {}
+        self.last_burst_alert = {}
+
+    def process_batch(self, raw_messages: List[str]) -> List[Dict]:
+        """پردازش دسته‌ای پیام‌های خام استریم"""
+        alerts = []
+        for message in self.decode_batch(raw_messages):
+            if not isinstance(message, dict):
+                continue
+            trade = message.get('data', message)
+            if not isinstance(trade, dict) or trade.get('e') != 'aggTrade':
+                continue
+
+            try:
+                alert = self.handle_trade(trade)
+            except (KeyError, TypeError, ValueError) as e:
+                self.logger.error(f"خطا در پردازش معامله: {e}")
+                continue
+
+            if alert:
+                alerts.append(alert)
+
+        return alerts
+
+    def decode_batch(self, raw_messages: List[str]) -> List[Dict]:
+        """رمزگشایی کل دسته با یک فراخوانی json"""
+        if not raw_messages:
+            return []
+
+        try:
+            return json.loads('[' + ','.join(raw_messages) + ']')
+        except ValueError:
+            # در صورت وجود پیام خراب، رمزگشایی تک‌به‌تک
+            decoded = []
+            for raw in raw_messages:
+                try:
+                    decoded.append(json.loads(raw))
+                except ValueError:
+                    self.logger.error(f"پیام نامعتبر از استریم: {raw[:100]}")
+            return decoded
+
+    def handle_trade(self, trade: Dict) -> Optional[Dict]:
+        """به‌روزرسانی پنجره‌ها و بررسی آستانه برای یک معامله"""
+        symbol = trade['s']
+        price = float(trade['p'])
+        quantity = float(trade['q'])
+        notional = price * quantity
+        timestamp = trade['T'] / 1000
+        # m=True یعنی خریدار سفارش‌گذار است، پس معامله‌گر فعال فروشنده است
+        is_buy = not trade['m']
+
+        window = self.windows.get(symbol)
+        if window is None:
+            window = self.windows[symbol] = TradeWindow(self.window)
+            self.bursts[symbol] = TradeWindow(self.burst_window)
+        burst = self.bursts[symbol]
+
+        window.add(timestamp, notional, is_buy)
+        burst.add(timestamp, notional, is_buy)
+
+        key = (symbol, is_buy)
+        if notional >= self.min_volume:
+            kind = 'trade'
+            amount = notional
+        else:
+            amount = burst.side_notional(is_buy)
+            if amount < self.min_volume:
+                # پایان هجوم؛ هجوم بعدی دوباره هشدار می‌دهد
+                self.last_burst_alert.pop(key, None)
+                return None
+
+            # در طول یک هجوم حداکثر یک هشدار در هر پنجره هجوم
+            last_alert = self.last_burst_alert.get(key)
+            if last_alert is not None and timestamp - last_alert < self.burst_window:
+                return None
+            kind = 'burst'
+
+        self.last_burst_alert[key] = timestamp
+        return self.create_alert(symbol, kind, is_buy, price, amount, window)
+
+    def get_aggregates(self, symbol: str, now: Optional[float] = None) -> Dict[str, float]:
+        """مجموع خرید و فروش در پنجره لغزان"""
+        window = self.windows.get(symbol)
+        if window is None:
+            return {'buy_notional': 0.0, 'sell_notional': 0.0, 'net_notional': 0.0}
+
+        # حذف معاملات قدیمی برای ارزهایی که معامله جدیدی نداشته‌اند
+        window.expire(time.time() if now is None else now)
+
+        return {
+            'buy_notional': window.buy_notional,
+            'sell_notional': window.sell_notional,
+            'net_notional': window.buy_notional - window.sell_notional
+        }
+
+    def create_alert(self, symbol: str, kind: str, is_buy: bool, price: float,
+                     amount: float, window: TradeWindow) -> Dict[str, Any]:
+        """ایجاد پیام هشدار معامله نهنگ"""
+        side = "خرید 🟢" if is_buy else "فروش 🔴"
+        title = "معامله نهنگ" if kind == 'trade' else f"هجوم {self.burst_window:g} ثانیه‌ای"
+
+        return {
+            'symbol': symbol,
+            'type': kind,
+            'side': 'buy' if is_buy else 'sell',
+            'notional': amount,
+            'message': f"""🐋 <b>{title}!</b>
+📊 <b>{symbol}</b> - {side}
+💰 قیمت: <code>{price:.4f}</code>
+💵 ارزش: <code>{amount:,.0f}</code>
+📈 خرید {self.window:g}s: <code>{window.buy_notional:,.0f}</code>
+📉 فروش {self.window:g}s: <code>{window.sell_notional:,.0f}</code>
+⏰ {datetime.now().strftime('%H:%M:%S')}"""
+        }
@@ -2,8 +2,10 @@
 import yaml
 import logging
 import os
+import queue
 import sys
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 
 # اضافه کردن مسیر پوشه‌ها به sys.path
@@ -12,41 +14,81 @@ sys.path.append(str(Path(__file__).parent))
 from core.monitor import WhaleMonitor
 from core.analyzer import SmartAnalyzer
 from core.notifier import NotificationManager
+from core.whale_detector import WhaleTradeDetector
 from plugins.binance import BinancePlugin
+from plugins.binance_stream import BinanceTradeStream
 from plugins.telegram import TelegramPlugin
 
-def setup_logging():
+def load_config():
+    """بارگذاری تنظیمات"""
+    config_path = Path(__file__).parent / "config" / "settings.yaml"
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+def setup_logging(config: dict):
     """تنظیمات لاگینگ پیشرفته"""
     log_dir = Path(__file__).parent / "logs"
     log_dir.mkdir(exist_ok=True)
     
+    log_config = config.get('logging', {})
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    
+    file_handler = RotatingFileHandler(
+        log_dir / f"whalepulse_{datetime.now().strftime('%Y%m%d')}.log",
+        maxBytes=log_config.get('max_file_size', 10485760),
+        backupCount=log_config.get('backup_count', 5),
+        encoding='utf-8'
+    )
+    handlers = [file_handler]
+    
+    # جدول کنسول در ترمینال هر بار صفحه را پاک می‌کند؛ در این حالت هشدارها و خطاها
+    # توسط ConsoleView زیر جدول نمایش داده می‌شوند
+    if not sys.stdout.isatty():
+        handlers.append(logging.StreamHandler())
+    
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    
+    # نوشتن در فایل و کنسول در رشته پس‌زمینه انجام می‌شود
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    
     logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_dir / f"whalepulse_{datetime.now().strftime('%Y%m%d')}.log", encoding='utf-8'),
-            logging.StreamHandler()
-        ]
+        level=log_config.get('level', 'INFO'),
+        # قالب‌بندی نهایی توسط هندلرهای listener انجام می‌شود
+        format='%(message)s',
+        handlers=[QueueHandler(log_queue)]
     )
-    return logging.getLogger(__name__)
+    listener.start()
+    return logging.getLogger(__name__), listener
 
 async def main():
     """تابع اصلی اجرای برنامه"""
-    logger = setup_logging()
+    # بارگذاری تنظیمات
+    try:
+        config = load_config()
+    except Exception as e:
+        # ثبت خطا با تنظیمات پیش‌فرض لاگینگ
+        logger, listener = setup_logging({})
+        logger.error(f"❌ خطای بحرانی: {e}")
+        listener.stop()
+        raise
+    
+    logger, listener = setup_logging(config)
     logger.info("🚀 WhalePulse Pro در حال شروع...")
+    logger.info("⚙️ تنظیمات بارگذاری شد")
     
     try:
-        # بارگذاری تنظیمات
-        config_path = Path(__file__).parent / "config" / "settings.yaml"
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
-        
-        logger.info("⚙️ تنظیمات بارگذاری شد")
-        
         # راه‌اندازی کامپوننت‌ها
         analyzer = SmartAnalyzer(config)
         notifier = NotificationManager(config)
         
+        trade_detector = None
+        trade_stream = None
+        if config['strategies']['whale_alert']['enabled']:
+            trade_detector = WhaleTradeDetector(config)
+            trade_stream = BinanceTradeStream(config)
+        
         monitor = WhaleMonitor(
             config=config,
             analyzer=analyzer,
@@ -54,7 +96,9 @@ async def main():
             plugins=[
                 BinancePlugin(config),
                 TelegramPlugin(config['notifications']['telegram'])
-            ]
+            ],
+            trade_detector=trade_detector,
+            trade_stream=trade_stream
         )
         
         logger.info("🔧 کامپوننت‌ها راه‌اندازی شدند")
@@ -65,6 +109,10 @@ async def main():
     except Exception as e:
         logger.error(f"❌ خطای بحرانی: {e}")
         raise
+    
+    finally:
+        # نوشتن لاگ‌های باقی‌مانده در صف
+        listener.stop()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,101 @@
+﻿import asyncio
+import aiohttp
+import contextlib
+import logging
+from typing import Dict, List, Callable, Awaitable
+
+class BinanceTradeStream:
+    """پلاگین استریم aggTrade بایننس"""
+
+    def __init__(self, config: Dict):
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+
+        whale_config = config['strategies']['whale_alert']
+        # آدرس قابل تغییر برای اتصال به استریم محلی در تست
+        self.base_url = whale_config.get('stream_url', "wss://stream.binance.com:9443/stream")
+        self.batch_size = whale_config.get('batch_size', 500)
+        self.max_queue = whale_config.get('max_queue', 10000)
+        self.reconnect_delay = whale_config.get('reconnect_delay', 5)
+        self.running = True
+
+    def build_url(self) -> str:
+        """ساخت آدرس استریم ترکیبی برای تمام ارزها"""
+        symbols = self.config.get('symbols', ['BTCUSDT'])
+        streams = '/'.join(f"{symbol.lower()}@aggTrade" for symbol in symbols)
+        return f"{self.base_url}?streams={streams}"
+
+    async def run(self, handler: Callable[[List[str]], Awaitable[None]]):
+        """دریافت پیام‌ها و ارسال دسته‌ای آن‌ها به handler"""
+        url = self.build_url()
+
+        while self.running:
+            try:
+                async with aiohttp.ClientSession() as session:
+                    async with session.ws_connect(url, heartbeat=30) as ws:
+                        self.logger.info("📡 اتصال به استریم معاملات برقرار شد")
+                        await self.consume(ws, handler)
+
+            except asyncio.CancelledError:
+                raise
+
+            except Exception as e:
+                self.logger.error(f"خطا در استریم معاملات: {e}")
+
+            if self.running:
+                await asyncio.sleep(self.reconnect_delay)
+
+    async def consume(self, ws, handler: Callable[[List[str]], Awaitable[None]]):
+        """خواندن پیام‌ها در صف و تخلیه دسته‌ای آن"""
+        queue = asyncio.Queue(maxsize=self.max_queue)
+
+        async def reader():
+            lagging = False
+            try:
+                async for msg in ws:
+                    if msg.type == aiohttp.WSMsgType.TEXT:
+                        # صف پر یعنی پردازش از استریم عقب مانده است
+                        if queue.full():
+                            if not lagging:
+                                self.logger.warning(f"⚠️ پردازش استریم عقب مانده است ({queue.qsize()} پیام در صف)")
+                            lagging = True
+                        elif queue.empty():
+                            lagging = False
+                        await queue.put(msg.data)
+                    elif msg.type == aiohttp.WSMsgType.ERROR:
+                        break
+            finally:
+                # بیدار کردن مصرف‌کننده حتی در صورت خطا برای اتصال مجدد؛
+                # اگر صف پر باشد مصرف‌کننده با تمام شدن reader متوقف می‌شود
+                with contextlib.suppress(asyncio.QueueFull):
+                    queue.put_nowait(None)
+
+        reader_task = asyncio.create_task(reader())
+        try:
+            while self.running:
+                if queue.empty() and reader_task.done():
+                    break
+                raw = await queue.get()
+                if raw is None:
+                    break
+
+                # جمع‌آوری پیام‌های رسیده تا سقف اندازه دسته
+                batch = [raw]
+                closed = False
+                while len(batch) < self.batch_size and not queue.empty():
+                    raw = queue.get_nowait()
+                    if raw is None:
+                        closed = True
+                        break
+                    batch.append(raw)
+
+                await handler(batch)
+                if closed:
+                    break
+        finally:
+            reader_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await reader_task
+
+    def stop(self):
+        self.running = False
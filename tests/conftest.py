@@ -0,0 +1,5 @@
+﻿import sys
+from pathlib import Path
+
+# اضافه کردن ریشه پروژه به sys.path مانند main.py
+sys.path.append(str(Path(__file__).parent.parent))
@@ -0,0 +1,71 @@
+﻿import asyncio
+from datetime import datetime, timedelta
+
+from core.analyzer import SmartAnalyzer
+
+def make_record(time, price, volume=100.0, last_seen=None):
+    return {'timestamp': time, 'last_seen': last_seen or time, 'price': price,
+            'volume': volume, 'price_change': 0.0}
+
+def make_ticker(price, volume=100.0, change=0.1):
+    return {'price': price, 'volume': volume, 'price_change_percent': change}
+
+def test_sampled_prices_rebuild_tick_series():
+    analyzer = SmartAnalyzer({'monitor': {'check_interval': 1}})
+    start = datetime(2025, 1, 1)
+    analyzer.historical_data['BTCUSDT'] = [
+        make_record(start, 100.0),
+        make_record(start + timedelta(seconds=5), 101.0, last_seen=start + timedelta(seconds=9))
+    ]
+
+    assert analyzer.sampled_prices('BTCUSDT', 10) == [100.0] * 5 + [101.0] * 5
+    # تاریخچه کافی برای تیک‌های قدیمی‌تر وجود ندارد
+    assert len(analyzer.sampled_prices('BTCUSDT', 20)) == 10
+
+def test_indicators_use_time_for_idle_symbols():
+    analyzer = SmartAnalyzer({})
+    now = datetime.now()
+    # ارز کم‌تحرک: دوازده تغییر چند ساعت پیش و بدون تغییر از آن زمان
+    start = now - timedelta(hours=3)
+    records = [make_record(start + timedelta(minutes=i), 1.0 + i) for i in range(12)]
+    records[-1]['last_seen'] = now
+    analyzer.historical_data['ADAUSDT'] = records
+
+    # در 10 تیک اخیر قیمتی تغییر نکرده است
+    assert analyzer.calculate_momentum('ADAUSDT') == 0.0
+    assert analyzer.calculate_volatility('ADAUSDT') == 0.0
+    assert analyzer.detect_trend('ADAUSDT') == "خنثی"
+    assert analyzer.find_support_resistance('ADAUSDT') == {'support': 12.0, 'resistance': 12.0}
+
+def test_unchanged_symbols_reuse_cached_analysis():
+    analyzer = SmartAnalyzer({})
+    market = {'BTCUSDT': make_ticker(100.0), 'ETHUSDT': make_ticker(10.0)}
+
+    first = asyncio.run(analyzer.analyze_market(market))
+    assert analyzer.changed_symbols == {'BTCUSDT', 'ETHUSDT'}
+
+    market['ETHUSDT'] = make_ticker(11.0)
+    second = asyncio.run(analyzer.analyze_market(market))
+
+    assert analyzer.changed_symbols == {'ETHUSDT'}
+    assert second['BTCUSDT'] is first['BTCUSDT']
+    assert second['ETHUSDT']['price'] == 11.0
+    assert len(analyzer.historical_data['BTCUSDT']) == 1
+    assert len(analyzer.historical_data['ETHUSDT']) == 2
+
+def test_failed_analysis_is_retried_without_duplicate_history():
+    analyzer = SmartAnalyzer({})
+    market = {'BTCUSDT': make_ticker(100.0)}
+    asyncio.run(analyzer.analyze_market(market))
+
+    original = analyzer.calculate_volatility
+    analyzer.calculate_volatility = lambda symbol: 1 / 0
+    market['BTCUSDT'] = make_ticker(105.0)
+    assert asyncio.run(analyzer.analyze_market(market)) == {}
+
+    analyzer.calculate_volatility = original
+    result = asyncio.run(analyzer.analyze_market(market))
+
+    assert result['BTCUSDT']['price'] == 105.0
+    assert analyzer.changed_symbols == {'BTCUSDT'}
+    assert [r['price'] for r in analyzer.historical_data['BTCUSDT']] == [100.0, 105.0]
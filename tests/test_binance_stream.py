@@ -0,0 +1,82 @@
+﻿import asyncio
+import contextlib
+import json
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from plugins.binance_stream import BinanceTradeStream
+
+MESSAGES_PER_CONNECTION = 50
+BATCH_SIZE = 20
+
+def make_config(url):
+    return {
+        'symbols': ['BTCUSDT', 'ETHUSDT'],
+        'strategies': {'whale_alert': {
+            'min_volume': 1000,
+            'stream_url': url,
+            'batch_size': BATCH_SIZE,
+            'reconnect_delay': 0
+        }}
+    }
+
+async def run_stream_against_local_server():
+    connections = []
+
+    async def stream_handler(request):
+        """استریم محلی جایگزین بایننس: ارسال پیام‌ها و بستن اتصال"""
+        connections.append(request.query['streams'])
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        for i in range(MESSAGES_PER_CONNECTION):
+            await ws.send_str(json.dumps({'stream': 'btcusdt@aggTrade',
+                                          'data': {'e': 'aggTrade', 'a': i}}))
+        await ws.close()
+        return ws
+
+    app = web.Application()
+    app.router.add_get('/stream', stream_handler)
+    server = TestServer(app)
+    await server.start_server()
+
+    stream = BinanceTradeStream(make_config(str(server.make_url('/stream'))))
+    batches = []
+    done = asyncio.Event()
+
+    async def handler(batch):
+        batches.append(batch)
+        # پردازش کند اولین دسته تا پیام‌ها در صف انباشته شوند
+        if len(batches) == 1:
+            await asyncio.sleep(0.2)
+        if sum(len(b) for b in batches) >= 2 * MESSAGES_PER_CONNECTION:
+            stream.stop()
+            done.set()
+
+    task = asyncio.create_task(stream.run(handler))
+    try:
+        await asyncio.wait_for(done.wait(), timeout=10)
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        await server.close()
+
+    return connections, batches
+
+def test_stream_batches_messages_and_reconnects():
+    connections, batches = asyncio.run(run_stream_against_local_server())
+
+    # اتصال اول توسط سرور بسته می‌شود و استریم دوباره وصل می‌شود
+    assert len(connections) >= 2
+    assert connections[0] == 'btcusdt@aggTrade/ethusdt@aggTrade'
+
+    assert all(len(batch) <= BATCH_SIZE for batch in batches)
+    assert max(len(batch) for batch in batches) == BATCH_SIZE
+
+    ids = [json.loads(raw)['data']['a'] for batch in batches for raw in batch]
+    assert ids[:MESSAGES_PER_CONNECTION] == list(range(MESSAGES_PER_CONNECTION))
+    assert ids[MESSAGES_PER_CONNECTION:2 * MESSAGES_PER_CONNECTION] == list(range(MESSAGES_PER_CONNECTION))
@@ -0,0 +1,37 @@
+﻿import io
+import logging
+
+from core.console import ConsoleView
+
+class FakeTerminal(io.StringIO):
+    def isatty(self):
+        return True
+
+ROW = {'price': 60000.0, 'volume': 1234567.0, 'price_change': 1.5}
+
+def test_console_redraw_is_throttled():
+    stream = io.StringIO()
+    view = ConsoleView({'monitor': {'console_refresh': 60}}, stream)
+    for _ in range(100):
+        view.update({'BTCUSDT': ROW})
+
+    assert stream.getvalue().count('BTCUSDT') == 1
+    assert ConsoleView.CLEAR_SCREEN not in stream.getvalue()
+
+def test_interactive_console_shows_recent_warnings():
+    stream = FakeTerminal()
+    view = ConsoleView({'monitor': {'console_log_lines': 2}}, stream)
+    logger = logging.getLogger('whalepulse.test')
+    try:
+        logger.warning("first")
+        logger.error("second")
+        logger.error("third")
+        logger.info("not shown")
+        view.render()
+    finally:
+        logging.getLogger().removeHandler(view.log_handler)
+
+    output = stream.getvalue()
+    assert output.startswith(ConsoleView.CLEAR_SCREEN)
+    assert "second" in output and "third" in output
+    assert "first" not in output and "not shown" not in output
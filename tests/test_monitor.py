@@ -0,0 +1,55 @@
+﻿import asyncio
+import json
+
+from core.monitor import WhaleMonitor
+from core.whale_detector import WhaleTradeDetector
+
+CONFIG = {
+    'strategies': {
+        'volume_spike': {'threshold': 50},
+        'whale_alert': {'min_volume': 1000000, 'cooldown': 60, 'max_pending_sends': 10}
+    }
+}
+
+class FakeNotifier:
+    def __init__(self):
+        self.messages = []
+
+    async def send_message(self, message: str):
+        self.messages.append(message)
+
+def make_message(notional, seconds, symbol='BTCUSDT'):
+    return json.dumps({'e': 'aggTrade', 's': symbol, 'p': '1', 'q': str(notional),
+                       'T': int(seconds * 1000), 'm': False})
+
+async def send_batches(monitor, batches):
+    for batch in batches:
+        await monitor.handle_trades(batch)
+    await asyncio.gather(*monitor.pending_sends)
+
+def make_monitor():
+    notifier = FakeNotifier()
+    monitor = WhaleMonitor(CONFIG, None, notifier, [], trade_detector=WhaleTradeDetector(CONFIG))
+    return monitor, notifier
+
+def test_much_larger_alert_bypasses_cooldown():
+    monitor, notifier = make_monitor()
+    asyncio.run(send_batches(monitor, [
+        [make_message(600000, 0), make_message(600000, 0.5)],  # هجوم 1.2M
+        [make_message(50000000, 1)],  # معامله 50M
+        [make_message(60000000, 2)]  # کمتر از دو برابر هشدار قبلی
+    ]))
+
+    assert len(notifier.messages) == 2
+    assert '50,000,000' in notifier.messages[1]
+
+def test_cooldown_and_batch_coalescing():
+    monitor, notifier = make_monitor()
+    asyncio.run(send_batches(monitor, [
+        [make_message(2000000, 0), make_message(3000000, 0.1), make_message(2000000, 0, 'ETHUSDT')],
+        [make_message(2500000, 1)]
+    ]))
+
+    assert len(notifier.messages) == 2
+    assert '3,000,000' in notifier.messages[0]
+    assert 'ETHUSDT' in notifier.messages[1]
@@ -0,0 +1,101 @@
+﻿import json
+
+from core.whale_detector import TradeWindow, WhaleTradeDetector
+
+CONFIG = {'strategies': {'whale_alert': {'min_volume': 1000, 'window': 60, 'burst_window': 2}}}
+
+def make_trade(notional, seconds, is_buy=True, symbol='BTCUSDT'):
+    return {'e': 'aggTrade', 's': symbol, 'p': '1', 'q': str(notional),
+            'T': int(seconds * 1000), 'm': not is_buy}
+
+def run_trades(detector, trades):
+    return [alert for alert in (detector.handle_trade(t) for t in trades) if alert]
+
+def test_trade_window_sums_and_expiry():
+    window = TradeWindow(10)
+    window.add(0, 100, True)
+    window.add(5, 40, False)
+    window.add(9, 60, True)
+    assert (window.buy_notional, window.sell_notional) == (160, 40)
+
+    # معامله زمان 0 در لحظه 10 از پنجره خارج می‌شود
+    window.add(10, 1, False)
+    assert (window.buy_notional, window.sell_notional) == (60, 41)
+
+    window.expire(100)
+    assert not window.trades
+    assert (window.buy_notional, window.sell_notional) == (0.0, 0.0)
+
+def test_single_trade_alert():
+    detector = WhaleTradeDetector(CONFIG)
+    alerts = run_trades(detector, [make_trade(5000, 0, is_buy=False)])
+
+    assert len(alerts) == 1
+    assert alerts[0]['type'] == 'trade'
+    assert alerts[0]['side'] == 'sell'
+    assert alerts[0]['notional'] == 5000
+
+def test_small_trades_without_burst_do_not_alert():
+    detector = WhaleTradeDetector(CONFIG)
+    assert run_trades(detector, [make_trade(300, i * 3) for i in range(10)]) == []
+
+def test_burst_alerts_once_per_burst_window():
+    detector = WhaleTradeDetector(CONFIG)
+    trades = [make_trade(400, i * 0.5) for i in range(12)]
+    alerts = run_trades(detector, trades)
+
+    assert [a['type'] for a in alerts] == ['burst'] * 3
+    assert all(a['notional'] >= 1000 for a in alerts)
+
+def test_sustained_burst_after_trade_alert_realerts():
+    detector = WhaleTradeDetector(CONFIG)
+    trades = [make_trade(2000, 0)] + [make_trade(400, (i + 1) * 0.5) for i in range(20)]
+    alerts = run_trades(detector, trades)
+
+    assert alerts[0]['type'] == 'trade'
+    assert [a['type'] for a in alerts[1:]] == ['burst'] * 5
+
+def test_burst_dedup_resets_after_flow_stops():
+    detector = WhaleTradeDetector(CONFIG)
+    first = run_trades(detector, [make_trade(600, 0), make_trade(600, 0.5)])
+    # جریان قطع می‌شود و معامله کوچک بعدی هجوم را پایان می‌دهد
+    run_trades(detector, [make_trade(10, 4.0)])
+    assert detector.last_burst_alert == {}
+
+    second = run_trades(detector, [make_trade(600, 4.2), make_trade(600, 4.4)])
+
+    assert len(first) == 1
+    assert len(second) == 1
+
+def test_sides_are_tracked_separately():
+    detector = WhaleTradeDetector(CONFIG)
+    alerts = run_trades(detector, [make_trade(600, 0, True), make_trade(600, 0.1, False)])
+    assert alerts == []
+
+def test_process_batch_skips_bad_items():
+    detector = WhaleTradeDetector(CONFIG)
+    raw = [
+        json.dumps({'stream': 'btcusdt@aggTrade', 'data': make_trade(5000, 0)}),
+        '[1,2]',
+        '"x"',
+        json.dumps({'e': 'trade', 's': 'BTCUSDT'}),
+        json.dumps(make_trade(5000, 1, symbol='ETHUSDT'))
+    ]
+    alerts = detector.process_batch(raw)
+    assert [a['symbol'] for a in alerts] == ['BTCUSDT', 'ETHUSDT']
+
+def test_decode_batch_falls_back_on_malformed_message():
+    detector = WhaleTradeDetector(CONFIG)
+    raw = [json.dumps(make_trade(1, 0)), '{bad', json.dumps(make_trade(2, 1))]
+
+    decoded = detector.decode_batch(raw)
+    assert [d['q'] for d in decoded] == ['1', '2']
+
+def test_get_aggregates_expires_quiet_symbols():
+    detector = WhaleTradeDetector(CONFIG)
+    run_trades(detector, [make_trade(500, 0, True), make_trade(200, 1, False)])
+
+    assert detector.get_aggregates('BTCUSDT', now=30) == {
+        'buy_notional': 500, 'sell_notional': 200, 'net_notional': 300}
+    assert detector.get_aggregates('BTCUSDT', now=120)['buy_notional'] == 0.0
+    assert detector.get_aggregates('ETHUSDT')['net_notional'] == 0.0